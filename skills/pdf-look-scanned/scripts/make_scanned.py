@@ -21,6 +21,7 @@ Options:
   --sig-clear L,T,R,B    Area to clear old signature (fractions, repeatable)
   --sig-place X,Y        Position to paste new signature (fractions, repeatable)
   --sig-size FLOAT       Signature width as fraction of page width (default: 0.11)
+  --color                Render and keep pages in RGB (default: grayscale)
   --seed INT             Random seed for reproducibility (default: 42)
 
 Examples:
@@ -46,21 +47,92 @@ Examples:
 """
 
 import argparse
+import functools
+import os
 import random
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
 try:
     import numpy as np
     from PIL import Image, ImageFilter, ImageEnhance, ImageDraw
     Image.MAX_IMAGE_PIXELS = 300_000_000
-    from pdf2image import convert_from_path
+    import fitz  # PyMuPDF
     import img2pdf
 except ImportError as e:
     print(f"Missing dependency: {e}")
-    print("Install with: pip3 install pillow pdf2image img2pdf numpy")
+    print("Install with: pip3 install pillow pymupdf img2pdf numpy")
     sys.exit(1)
 
+try:
+    import cv2  # optional: SIMD-vectorized rotate/blur/contrast path
+except ImportError:
+    cv2 = None
+
+try:
+    from numba import njit, prange  # optional: single-pass ink bbox search
+except ImportError:
+    njit = None
+
+try:
+    # Optional: libjpeg-turbo encoder (~2x faster than Pillow's libjpeg path).
+    # The constructor raises if the native library is missing, not just import.
+    from turbojpeg import TurboJPEG, TJPF_GRAY, TJPF_RGB, TJSAMP_GRAY
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _ink_bbox(arr, thresh):
+        """Bounding box of pixels below thresh in one pass, no mask allocation."""
+        h, w = arr.shape
+        rmin, rmax, cmin, cmax = h, -1, w, -1
+        for y in prange(h):
+            for x in range(w):
+                if arr[y, x] < thresh:
+                    rmin = min(rmin, y)
+                    rmax = max(rmax, y)
+                    cmin = min(cmin, x)
+                    cmax = max(cmax, x)
+        return rmin, rmax, cmin, cmax
+
+
+_rng = np.random.default_rng()
+
+
+def seed_rngs(seed):
+    """Seed both the stdlib and NumPy generators for reproducible output."""
+    global _rng
+    random.seed(seed)
+    _rng = np.random.default_rng(seed)
+
+
+def render_page(page, dpi, gray=False):
+    """Rasterize a single PyMuPDF page to a PIL image at the given DPI."""
+    mat = fitz.Matrix(dpi / 72, dpi / 72)
+    colorspace = fitz.csGRAY if gray else fitz.csRGB
+    pix = page.get_pixmap(matrix=mat, alpha=False, colorspace=colorspace)
+    return Image.frombytes("L" if gray else "RGB", (pix.width, pix.height), pix.samples)
+
+
+def iter_pages(path, dpi, gray=True):
+    """Yield PDF pages one at a time as PIL images, keeping only one resident.
+
+    Gray is the default: a scan looks grayscale anyway, and rendering "L"
+    directly moves a third of the bytes of RGB through the whole pipeline.
+    """
+    doc = fitz.open(str(path))
+    try:
+        for page in doc:
+            yield render_page(page, dpi, gray=gray)
+    finally:
+        doc.close()
+
 
 def extract_signature(sig_page: Image.Image, crop_box: tuple, ink_threshold=210) -> Image.Image:
     """Extract signature from a crop region, trimming to ink bounding box."""
@@ -70,15 +142,20 @@ def extract_signature(sig_page: Image.Image, crop_box: tuple, ink_threshold=210)
 
     gray = sig_area.convert("L")
     arr = np.array(gray)
-    ink_mask = arr < ink_threshold
-    rows = np.any(ink_mask, axis=1)
-    cols = np.any(ink_mask, axis=0)
+    if njit is not None:
+        rmin, rmax, cmin, cmax = _ink_bbox(arr, ink_threshold)
+        if rmax < 0:
+            return sig_area
+    else:
+        ink_mask = arr < ink_threshold
+        rows = np.any(ink_mask, axis=1)
+        cols = np.any(ink_mask, axis=0)
 
-    if not rows.any():
-        return sig_area
+        if not rows.any():
+            return sig_area
 
-    rmin, rmax = np.where(rows)[0][[0, -1]]
-    cmin, cmax = np.where(cols)[0][[0, -1]]
+        rmin, rmax = np.where(rows)[0][[0, -1]]
+        cmin, cmax = np.where(cols)[0][[0, -1]]
 
     pad = 10
     rmin = max(0, rmin - pad)
@@ -89,6 +166,45 @@ def extract_signature(sig_page: Image.Image, crop_box: tuple, ink_threshold=210)
     return sig_area.crop((cmin, rmin, cmax, rmax))
 
 
+_sig_cache = {}
+
+
+def _prepared_signature(real_sig, target_w):
+    """Masked RGBA signature resized to target_w, cached across target pages.
+
+    The LANCZOS resize is the expensive part and depends only on the signature
+    and target width (identical for every same-width page), so reuse is free.
+
+    The alpha mask is computed on the full-resolution image BEFORE resizing. Resizing an RGB
+    image with a sharp ink/background edge via LANCZOS can ring (overshoot/undershoot) right
+    at that edge, so if the mask were computed post-resize, ringing pixels that dip just below
+    the threshold get treated as fully-opaque "ink" -- visible as a faint gray halo/line
+    tracing the ink's silhouette. Masking first and resizing the whole RGBA together lets the
+    alpha channel interpolate smoothly at edges instead of hard-flipping to opaque.
+    """
+    key = (id(real_sig), target_w)
+    cached = _sig_cache.get(key)
+    if cached is not None:
+        return cached
+
+    sig_rgba_full = real_sig.convert("RGBA")
+    sig_arr_full = np.array(sig_rgba_full)
+    # Integer luma instead of np.mean, which would promote to a float64 temporary
+    luma = sig_arr_full[:, :, 0].astype(np.uint16)
+    luma += sig_arr_full[:, :, 1]
+    luma += sig_arr_full[:, :, 2]
+    luma //= 3
+    sig_arr_full[:, :, 3] = (luma <= 220).view(np.uint8) * 255
+    sig_rgba_full = Image.fromarray(sig_arr_full)
+
+    sig_w, sig_h = real_sig.size
+    scale = target_w / sig_w
+    sig_transparent = sig_rgba_full.resize(
+        (int(sig_w * scale), int(sig_h * scale)), Image.LANCZOS)
+    _sig_cache[key] = sig_transparent
+    return sig_transparent
+
+
 def replace_signature(page_img, real_sig, clear_box, place_xy, sig_size=0.11):
     """Clear old signature area and paste new signature."""
     w, h = page_img.size
@@ -96,80 +212,148 @@ def replace_signature(page_img, real_sig, clear_box, place_xy, sig_size=0.11):
 
     cl, ct, cr, cb = clear_box
     draw = ImageDraw.Draw(page)
-    draw.rectangle([int(w * cl), int(h * ct), int(w * cr), int(h * cb)], fill=(255, 255, 255))
-
-    # Compute the alpha mask on the full-resolution image BEFORE resizing. Resizing an RGB
-    # image with a sharp ink/background edge via LANCZOS can ring (overshoot/undershoot) right
-    # at that edge, so if the mask were computed post-resize, ringing pixels that dip just below
-    # the threshold get treated as fully-opaque "ink" -- visible as a faint gray halo/line
-    # tracing the ink's silhouette. Masking first and resizing the whole RGBA together lets the
-    # alpha channel interpolate smoothly at edges instead of hard-flipping to opaque.
-    sig_rgba_full = real_sig.convert("RGBA")
-    sig_arr_full = np.array(sig_rgba_full)
-    gray_vals_full = np.mean(sig_arr_full[:, :, :3], axis=2)
-    sig_arr_full[:, :, 3] = np.where(gray_vals_full > 220, 0, 255).astype(np.uint8)
-    sig_rgba_full = Image.fromarray(sig_arr_full)
+    white = 255 if page.mode == "L" else (255, 255, 255)
+    draw.rectangle([int(w * cl), int(h * ct), int(w * cr), int(h * cb)], fill=white)
 
-    sig_w, sig_h = real_sig.size
-    target_w = int(w * sig_size)
-    scale = target_w / sig_w
-    new_w = int(sig_w * scale)
-    new_h = int(sig_h * scale)
-    sig_transparent = sig_rgba_full.resize((new_w, new_h), Image.LANCZOS)
+    sig_transparent = _prepared_signature(real_sig, int(w * sig_size))
 
     px, py = place_xy
     paste_x = int(w * px)
     paste_y = int(h * py)
 
-    page_rgba = page.convert("RGBA")
-    page_rgba.paste(sig_transparent, (paste_x, paste_y), sig_transparent)
-    return page_rgba.convert("RGB")
+    # Composite directly on the page array instead of converting the whole page
+    # RGB→RGBA→RGB for PIL's paste. Integer alpha blend over just the paste
+    # region — keeps the smoothly interpolated mask edges from the resize.
+    page_arr = np.array(page)
+    sig_arr = np.asarray(sig_transparent)
+    y1 = min(paste_y + sig_arr.shape[0], page_arr.shape[0])
+    x1 = min(paste_x + sig_arr.shape[1], page_arr.shape[1])
+    if y1 <= paste_y or x1 <= paste_x:
+        return page
+    sig_arr = sig_arr[:y1 - paste_y, :x1 - paste_x]
+
+    alpha = sig_arr[:, :, 3].astype(np.uint16)
+    sub = page_arr[paste_y:y1, paste_x:x1]
+    if page_arr.ndim == 2:  # grayscale page: blend the signature's luma
+        sig_px = sig_arr[:, :, 0].astype(np.uint16)
+        sig_px += sig_arr[:, :, 1]
+        sig_px += sig_arr[:, :, 2]
+        sig_px //= 3
+    else:
+        sig_px = sig_arr[:, :, :3].astype(np.uint16)
+        alpha = alpha[:, :, None]
+    sub[:] = ((sig_px * alpha + sub * (255 - alpha)) // 255).astype(np.uint8)
+    return Image.fromarray(page_arr)
+
+
+def _encode_jpeg(img, quality):
+    """JPEG-encode a PIL image, through libjpeg-turbo when available."""
+    if _turbo is not None:
+        arr = np.asarray(img)
+        if img.mode == "L":
+            return _turbo.encode(arr[:, :, None], quality=quality,
+                                 pixel_format=TJPF_GRAY, jpeg_subsample=TJSAMP_GRAY)
+        return _turbo.encode(arr, quality=quality, pixel_format=TJPF_RGB)
+    buf = BytesIO()
+    img.save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def _apply_noise(arr, noise_std):
+    """Additive Gaussian noise on a uint8 array — float32 end-to-end, add/clip
+    in place to avoid the float64 temporaries np.random.normal would allocate."""
+    arr_f = arr.astype(np.float32)
+    noise = _rng.standard_normal(arr_f.shape, dtype=np.float32)
+    noise *= noise_std
+    np.add(arr_f, noise, out=arr_f)
+    np.clip(arr_f, 0, 255, out=arr_f)
+    return arr_f.astype(np.uint8, copy=False)
+
+
+@functools.lru_cache(maxsize=8)
+def _vignette(w, h, margin=30):
+    """Edge-shadow mask for a page size: opacity ramps down toward each edge."""
+    ys = np.minimum(np.arange(h), h - 1 - np.arange(h))
+    xs = np.minimum(np.arange(w), w - 1 - np.arange(w))
+    dist = np.minimum.outer(ys, xs)
+    opacity = np.clip(255 - (margin - np.minimum(dist, margin)) * 1.5, 0, 255).astype(np.uint8)
+    return Image.fromarray(opacity, "L")
 
 
 def make_scanned_page(img, noise_std=5.0, blur_radius=0.6, max_rotation=0.7,
                       contrast_min=0.88, contrast_max=0.95):
-    """Apply scanned-document effects to a page image."""
-    # Grayscale
-    gray = img.convert("L")
-    img = gray.convert("RGB")
+    """Apply scanned-document effects to a page image ("L" or "RGB" mode)."""
+    # Grayscale happens at render time ("L" pages by default); --color keeps RGB
+    gray = img.mode == "L"
 
-    # Slight rotation
     angle = random.uniform(-max_rotation, max_rotation)
-    img = img.rotate(angle, resample=Image.BICUBIC, expand=False, fillcolor=(255, 255, 255))
-
-    # Gaussian noise
-    arr = np.array(img, dtype=np.float32)
-    noise = np.random.normal(0, noise_std, arr.shape)
-    arr = np.clip(arr + noise, 0, 255).astype(np.uint8)
-    img = Image.fromarray(arr)
-
-    # Blur
-    img = img.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-
-    # Brightness/contrast
-    brightness = ImageEnhance.Brightness(img)
-    img = brightness.enhance(random.uniform(0.96, 1.03))
-    contrast = ImageEnhance.Contrast(img)
-    img = contrast.enhance(random.uniform(contrast_min, contrast_max))
-
-    # Edge shadow
-    shadow = Image.new("L", img.size, 255)
-    draw = ImageDraw.Draw(shadow)
+
+    if cv2 is not None:
+        # Rotation, blur and the brightness/contrast linear map all run as
+        # single OpenCV passes over the ndarray — no PIL round trips
+        arr = np.asarray(img)
+        h, w = arr.shape[:2]
+        mat = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+        arr = cv2.warpAffine(arr, mat, (w, h), flags=cv2.INTER_CUBIC,
+                             borderMode=cv2.BORDER_CONSTANT,
+                             borderValue=255 if gray else (255, 255, 255))
+        arr = _apply_noise(arr, noise_std)
+        if blur_radius > 0:
+            arr = cv2.GaussianBlur(arr, (0, 0), blur_radius)
+        bright = random.uniform(0.96, 1.03)
+        contrast = random.uniform(contrast_min, contrast_max)
+        # PIL's Contrast pivots on the gray mean; fold brightness and contrast
+        # into one fused map: out = (bright*contrast)*px + (1-contrast)*mean
+        mean = float((arr if gray else cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)).mean())
+        arr = cv2.convertScaleAbs(arr, alpha=bright * contrast,
+                                  beta=(1 - contrast) * mean * bright)
+        img = Image.fromarray(arr)
+    else:
+        # Slight rotation
+        img = img.rotate(angle, resample=Image.BICUBIC, expand=False,
+                         fillcolor=255 if gray else (255, 255, 255))
+
+        # Gaussian noise
+        img = Image.fromarray(_apply_noise(np.asarray(img), noise_std))
+
+        # Blur
+        img = img.filter(ImageFilter.GaussianBlur(radius=blur_radius))
+
+        # Brightness/contrast
+        brightness = ImageEnhance.Brightness(img)
+        img = brightness.enhance(random.uniform(0.96, 1.03))
+        contrast = ImageEnhance.Contrast(img)
+        img = contrast.enhance(random.uniform(contrast_min, contrast_max))
+
+    # Edge shadow (mask computed once per page size, cached across pages)
     w, h = img.size
-    margin = 30
-    for i in range(margin):
-        opacity = int(255 - (margin - i) * 1.5)
-        draw.rectangle([i, i, w - i - 1, h - i - 1], outline=opacity)
-    img = Image.composite(img, Image.new("RGB", img.size, (200, 200, 200)), shadow)
+    shadow_bg = Image.new(img.mode, img.size, 200 if gray else (200, 200, 200))
+    img = Image.composite(img, shadow_bg, _vignette(w, h))
 
     # Random offset
     offset_x = random.randint(-3, 3)
     offset_y = random.randint(-3, 3)
-    canvas = Image.new("RGB", img.size, (245, 245, 240))
+    canvas = Image.new(img.mode, img.size, 244 if gray else (245, 245, 240))
     canvas.paste(img, (offset_x, offset_y))
     return canvas
 
 
+def _process_page(task):
+    """Worker: apply the scan effect to one page and return its JPEG bytes."""
+    page_idx, mode, size, pixel_bytes, params = task
+    seed_rngs(params["seed"] + page_idx)
+    page = Image.frombytes(mode, size, pixel_bytes)
+    scanned = make_scanned_page(
+        page,
+        noise_std=params["noise"],
+        blur_radius=params["blur"],
+        max_rotation=params["rotation"],
+        contrast_min=params["contrast_min"],
+        contrast_max=params["contrast_max"],
+    )
+    return _encode_jpeg(scanned, params["quality"])
+
+
 def parse_tuple(s):
     """Parse comma-separated floats."""
     return tuple(float(x) for x in s.split(","))
@@ -194,65 +378,76 @@ def main():
     parser.add_argument("--sig-place", action="append", default=[])
     parser.add_argument("--sig-size", type=float, default=0.11)
     parser.add_argument("--sig-dpi", type=int, default=350)
+    parser.add_argument("--color", action="store_true",
+                        help="Render and keep pages in RGB (default: grayscale)")
     parser.add_argument("--seed", type=int, default=42)
 
     args = parser.parse_args()
-    random.seed(args.seed)
+    seed_rngs(args.seed)
 
     input_path = Path(args.input)
     output_path = Path(args.output) if args.output else input_path.with_stem(input_path.stem + "_scanned")
 
-    # Signature replacement setup
-    signatures = []
+    # Signature replacement setup: only rasterize the signature pages we need.
+    # Specs accumulate per target page — one page can take several (e.g.
+    # signature + initials), applied in argument order.
+    signatures = {}  # target page index (0-based) -> [replacement spec, ...]
     if args.sig_pdf and args.sig_page:
         print(f"Loading signature PDF at {args.sig_dpi} DPI...")
-        sig_pages = convert_from_path(args.sig_pdf, dpi=args.sig_dpi)
-
+        sig_doc = fitz.open(args.sig_pdf)
         for i, (page_num, crop_str, target, clear_str, place_str) in enumerate(
             zip(args.sig_page, args.sig_crop, args.sig_target, args.sig_clear, args.sig_place)
         ):
-            sig_img = extract_signature(sig_pages[page_num - 1], parse_tuple(crop_str))
-            signatures.append({
+            sig_page = render_page(sig_doc.load_page(page_num - 1), args.sig_dpi)
+            sig_img = extract_signature(sig_page, parse_tuple(crop_str))
+            signatures.setdefault(target - 1, []).append({
                 "sig": sig_img,
-                "target": target - 1,  # 0-indexed
                 "clear": parse_tuple(clear_str),
                 "place": parse_tuple(place_str),
             })
             print(f"  Signature {i + 1}: extracted {sig_img.size} from page {page_num}")
+        sig_doc.close()
 
-    # Load contract
+    with fitz.open(str(input_path)) as doc:
+        num_pages = doc.page_count
     print(f"Loading PDF at {args.dpi} DPI...")
-    pages = convert_from_path(str(input_path), dpi=args.dpi)
-    print(f"  {len(pages)} pages")
-
-    # Replace signatures
-    for s in signatures:
-        idx = s["target"]
-        print(f"Replacing signature on page {idx + 1}...")
-        pages[idx] = replace_signature(pages[idx], s["sig"], s["clear"], s["place"], args.sig_size)
+    print(f"  {num_pages} pages")
 
-    # Apply scanned effect
+    # Stream pages to a process pool: render, replace signature if needed, then
+    # apply the effect + JPEG encode in parallel workers. Each page is seeded with
+    # seed + page index so output stays reproducible regardless of worker timing.
+    # In-flight submissions are bounded so the renderer stays ahead of the pool
+    # without materializing the whole document.
     print("Applying scanned effect...")
-    import tempfile
-    processed = []
-    with tempfile.TemporaryDirectory() as tmpdir:
-        for i, page in enumerate(pages):
-            print(f"  Page {i + 1}/{len(pages)}...", end="\r")
-            scanned = make_scanned_page(
-                page,
-                noise_std=args.noise,
-                blur_radius=args.blur,
-                max_rotation=args.rotation,
-                contrast_min=args.contrast_min,
-                contrast_max=args.contrast_max,
-            )
-            tmp_path = Path(tmpdir) / f"page_{i:03d}.jpg"
-            scanned.save(str(tmp_path), "JPEG", quality=args.quality)
-            processed.append(str(tmp_path))
-
-        print(f"\nCombining into PDF...")
-        with open(str(output_path), "wb") as f:
-            f.write(img2pdf.convert(processed))
+    params = {
+        "seed": args.seed,
+        "noise": args.noise,
+        "blur": args.blur,
+        "rotation": args.rotation,
+        "contrast_min": args.contrast_min,
+        "contrast_max": args.contrast_max,
+        "quality": args.quality,
+    }
+    workers = os.cpu_count() or 1
+    # img2pdf copies JPEG streams verbatim, so the encoded pages can stay in
+    # memory — no temp files, and peak memory is pages x jpeg_size, not raster size
+    jpeg_pages = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending = deque()
+        for i, page in enumerate(iter_pages(input_path, args.dpi, gray=not args.color)):
+            print(f"  Page {i + 1}/{num_pages}...", end="\r")
+            for sig in signatures.get(i, ()):
+                print(f"Replacing signature on page {i + 1}...")
+                page = replace_signature(page, sig["sig"], sig["clear"], sig["place"], args.sig_size)
+            pending.append(ex.submit(_process_page, (i, page.mode, page.size, page.tobytes(), params)))
+            if len(pending) >= workers * 2:
+                jpeg_pages.append(pending.popleft().result())
+        while pending:
+            jpeg_pages.append(pending.popleft().result())
+
+    print(f"\nCombining into PDF...")
+    with open(str(output_path), "wb") as f:
+        f.write(img2pdf.convert(jpeg_pages))
 
     size_mb = output_path.stat().st_size / 1024 / 1024
     print(f"Done! {output_path} ({size_mb:.1f} MB)")
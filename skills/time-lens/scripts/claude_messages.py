@@ -25,9 +25,17 @@ Output JSON:
 import os
 import json
 import argparse
-import glob
+import calendar
+import mmap
 from datetime import datetime, timezone
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+try:
+    from orjson import loads as json_loads  # ~3-5x faster; accepts bytes directly
+except ImportError:
+    json_loads = json.loads
 
 
 def path_to_encoded(abs_path):
@@ -52,6 +60,20 @@ def find_project_dirs(projects_dir, project_path=None, name_filter=None):
     ]
 
 
+def _fast_iso_to_epoch(ts_str):
+    """
+    Epoch seconds for a 'YYYY-MM-DDTHH:MM:SS(.fff)Z' string via slice math —
+    skips datetime construction and timezone machinery (UTC only).
+    """
+    epoch = calendar.timegm((
+        int(ts_str[0:4]), int(ts_str[5:7]), int(ts_str[8:10]),
+        int(ts_str[11:13]), int(ts_str[14:16]), int(ts_str[17:19]), 0, 0, 0,
+    ))
+    if len(ts_str) > 20 and ts_str[19] == ".":
+        epoch += float(ts_str[19:].rstrip("Z"))
+    return epoch
+
+
 def is_real_prompt(obj):
     """Return True if this session entry is an actual user prompt (not a tool result)."""
     content = obj.get("message", {}).get("content", "")
@@ -63,6 +85,69 @@ def is_real_prompt(obj):
     return False
 
 
+def _jsonl_files(dir_path):
+    """List *.jsonl paths in a directory via os.scandir (cheaper than glob)."""
+    try:
+        with os.scandir(dir_path) as entries:
+            return [e.path for e in entries
+                    if e.is_file() and e.name.endswith(".jsonl")]
+    except OSError:
+        return []
+
+
+def _mmap_lines(f):
+    """Yield lines from an open binary file via mmap (zero-copy iteration)."""
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty file
+        return
+    with mm:
+        yield from iter(mm.readline, b"")
+
+
+def _extract_project(line):
+    """
+    Pull the "project" value out of a history line at the bytes level.
+    Falls back to a full JSON parse when the value contains escapes.
+    Returns the path string or None.
+    """
+    key_pos = line.find(b'"project"')
+    if key_pos == -1:
+        return None
+    start = line.find(b'"', key_pos + 9) + 1
+    if start == 0:
+        return None
+    end = line.find(b'"', start)
+    if end == -1:
+        return None
+    if line[end - 1:end] == b"\\":  # escaped quote in the path — parse properly
+        try:
+            return json_loads(line).get("project")
+        except ValueError:
+            return None
+    return line[start:end].decode("utf-8", "replace")
+
+
+def history_project_index(history_path=None):
+    """
+    One mmap pass over history.jsonl building {basename: set(project paths)}
+    for folder-move detection — no per-line JSON parsing.
+    """
+    index = defaultdict(set)
+    if history_path is None:
+        history_path = os.path.expanduser("~/.claude/history.jsonl")
+    if not os.path.exists(history_path):
+        return index
+
+    with open(history_path, "rb") as f:
+        for line in _mmap_lines(f):
+            proj = _extract_project(line)
+            if proj:
+                index[os.path.basename(proj)].add(proj)
+
+    return index
+
+
 def collect_from_history(project_path):
     """
     Collect prompts from ~/.claude/history.jsonl filtered by project path.
@@ -75,14 +160,19 @@ def collect_from_history(project_path):
     if not os.path.exists(history_path) or not project_path:
         return daily, seen_ts
 
-    with open(history_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
+    # Cheap bytes-level prefilter: the JSON-encoded path (quotes included) must
+    # appear in a line for "project" to match — skips parsing non-matching
+    # lines. ensure_ascii=False matches the raw UTF-8 the files store, so
+    # non-ASCII paths don't get \uXXXX-escaped into a needle that never hits.
+    needle = json.dumps(project_path, ensure_ascii=False).encode()
+
+    with open(history_path, "rb") as f:
+        for line in _mmap_lines(f):
+            if needle not in line:
                 continue
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
+                obj = json_loads(line)
+            except ValueError:
                 continue
 
             if obj.get("project") != project_path:
@@ -100,47 +190,70 @@ def collect_from_history(project_path):
     return daily, seen_ts
 
 
+def _parse_session_file(jsonl_file, project_path, cwd_needle):
+    """Parse one session file; return [(rounded_ts, date), ...] for real prompts."""
+    prompts = []
+    try:
+        with open(jsonl_file, "rb") as f:
+            for line in f:
+                if cwd_needle is not None and cwd_needle not in line:
+                    continue
+                # No .strip() — both parsers tolerate the trailing newline, and
+                # blank lines just fall through the except below
+                try:
+                    obj = json_loads(line)
+                except ValueError:
+                    continue
+
+                if obj.get("type") != "user":
+                    continue
+                if project_path and obj.get("cwd") != project_path:
+                    continue
+                if not is_real_prompt(obj):
+                    continue
+
+                ts_str = obj.get("timestamp", "")
+                try:
+                    if ts_str.endswith("Z"):
+                        # Common case: UTC timestamps, date is the first 10 chars
+                        prompts.append((round(_fast_iso_to_epoch(ts_str)), ts_str[:10]))
+                    else:
+                        dt = datetime.fromisoformat(ts_str)
+                        prompts.append((round(dt.timestamp()), dt.strftime("%Y-%m-%d")))
+                except Exception:
+                    continue
+    except (IOError, PermissionError):
+        pass
+    return prompts
+
+
 def collect_from_session_files(project_dirs, project_path, seen_ts):
     """
     Collect actual user prompts from session .jsonl files.
-    Skips entries already accounted for in history (dedup by rounded timestamp).
+    Files are parsed in parallel (I/O bound); the dedup merge against history
+    timestamps stays single-threaded for determinism.
     Returns {date: count}.
     """
     daily = defaultdict(int)
+    cwd_needle = (json.dumps(project_path, ensure_ascii=False).encode()
+                  if project_path else None)
 
-    for proj_dir in project_dirs:
-        for jsonl_file in glob.glob(os.path.join(proj_dir, "*.jsonl")):
-            try:
-                with open(jsonl_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if not line:
-                            continue
-                        try:
-                            obj = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-
-                        if obj.get("type") != "user":
-                            continue
-                        if project_path and obj.get("cwd") != project_path:
-                            continue
-                        if not is_real_prompt(obj):
-                            continue
-
-                        ts_str = obj.get("timestamp", "")
-                        try:
-                            dt = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
-                            ts_rounded = round(dt.timestamp())
-                            date = dt.strftime("%Y-%m-%d")
-                        except Exception:
-                            continue
-
-                        if ts_rounded not in seen_ts:
-                            seen_ts.add(ts_rounded)
-                            daily[date] += 1
-            except (IOError, PermissionError):
-                pass
+    files = [
+        jsonl_file
+        for proj_dir in project_dirs
+        for jsonl_file in _jsonl_files(proj_dir)
+    ]
+    if not files:
+        return daily
+
+    with ThreadPoolExecutor(max_workers=min(16, len(files))) as ex:
+        parse = partial(_parse_session_file, project_path=project_path,
+                        cwd_needle=cwd_needle)
+        for prompts in ex.map(parse, files):
+            for ts_rounded, date in prompts:
+                if ts_rounded not in seen_ts:
+                    seen_ts.add(ts_rounded)
+                    daily[date] += 1
 
     return daily
 
@@ -170,27 +283,18 @@ def main():
         # (history.jsonl stores exact absolute paths — no lossy encoding)
         if args.project_path:
             target_name = os.path.basename(args.project_path)
-            alternates = set()
-            history_path = os.path.expanduser("~/.claude/history.jsonl")
-            if os.path.exists(history_path):
-                with open(history_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        try:
-                            obj = json.loads(line.strip())
-                            proj = obj.get("project", "")
-                            if (proj and proj != args.project_path and
-                                    os.path.basename(proj) == target_name):
-                                alternates.add(proj)
-                        except (json.JSONDecodeError, KeyError):
-                            pass
+            alternates = {
+                proj for proj in history_project_index().get(target_name, ())
+                if proj != args.project_path
+            }
             # Also check project dir names (session cwd fields)
             for entry in os.scandir(os.path.expanduser(args.projects_dir)):
                 if not entry.is_dir():
                     continue
-                for jf in glob.glob(os.path.join(entry.path, "*.jsonl")):
+                for jf in _jsonl_files(entry.path):
                     try:
-                        with open(jf) as f:
-                            obj = json.loads(f.readline().strip())
+                        with open(jf, "rb") as f:
+                            obj = json_loads(f.readline())
                             cwd = obj.get("cwd", "")
                             if (cwd and cwd != args.project_path and
                                     os.path.basename(cwd) == target_name):
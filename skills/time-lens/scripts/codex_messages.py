@@ -9,6 +9,7 @@ Data source: ~/.codex/sessions/YYYY/MM/DD/rollout-*.jsonl
 Usage:
   python3 codex_messages.py --project-path /abs/path/to/repo
   python3 codex_messages.py --filter project-name
+  python3 codex_messages.py --project-path /abs/path --since 2026-01-01 --until 2026-02-28
 
 Output JSON:
   {
@@ -23,66 +24,193 @@ Output JSON:
 import os
 import json
 import argparse
-import glob
+import calendar
 from datetime import datetime, timezone
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+try:
+    from orjson import loads as json_loads  # ~3-5x faster; accepts bytes directly
+except ImportError:
+    json_loads = json.loads
 
-def scan_sessions(sessions_dir, project_path=None, name_filter=None):
+
+def _fast_iso_to_epoch(ts_str):
+    """
+    Epoch seconds for a 'YYYY-MM-DDTHH:MM:SS(.fff)Z' string via slice math —
+    skips datetime construction and timezone machinery (UTC only).
+    """
+    epoch = calendar.timegm((
+        int(ts_str[0:4]), int(ts_str[5:7]), int(ts_str[8:10]),
+        int(ts_str[11:13]), int(ts_str[14:16]), int(ts_str[17:19]), 0, 0, 0,
+    ))
+    if len(ts_str) > 20 and ts_str[19] == ".":
+        epoch += float(ts_str[19:].rstrip("Z"))
+    return epoch
+
+
+def _iter_session_files(sessions_dir, since=None, until=None):
+    """
+    Yield rollout .jsonl paths under sessions_dir/YYYY/MM/DD/, pruning whole
+    day directories outside the since/until window without opening any file.
+    """
+    for y in sorted(os.scandir(sessions_dir), key=lambda e: e.name):
+        if not y.is_dir() or not y.name.isdigit():
+            continue
+        for m in sorted(os.scandir(y.path), key=lambda e: e.name):
+            if not m.is_dir() or not m.name.isdigit():
+                continue
+            for d in sorted(os.scandir(m.path), key=lambda e: e.name):
+                if not d.is_dir() or not d.name.isdigit():
+                    continue
+                day = f"{y.name}-{m.name}-{d.name}"
+                if (since and day < since) or (until and day > until):
+                    continue
+                for entry in sorted(os.scandir(d.path), key=lambda e: e.name):
+                    if entry.is_file() and entry.name.endswith(".jsonl"):
+                        yield entry.path
+
+
+_CWD_INDEX_PATH = os.path.expanduser("~/.cache/time-lens/codex_cwd_index.json")
+
+
+def _load_cwd_index():
+    """{file path: [mtime, size, cwd]} persisted across runs."""
+    try:
+        with open(_CWD_INDEX_PATH, "rb") as f:
+            return json_loads(f.read())
+    except (IOError, ValueError):
+        return {}
+
+
+def _save_cwd_index(index):
+    try:
+        os.makedirs(os.path.dirname(_CWD_INDEX_PATH), exist_ok=True)
+        tmp = _CWD_INDEX_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, _CWD_INDEX_PATH)
+    except IOError:
+        pass
+
+
+def _parse_session_file(jsonl_path, project_path, name_filter):
+    """Parse one rollout file; return (cwd, [(date, ts_epoch), ...]) prompts."""
+    cwd = None
+    session_prompts = []
+
+    try:
+        with open(jsonl_path, "rb") as f:
+            # session_meta is always the first entry; if it names a different
+            # project there is no need to parse the rest of the file at all,
+            # but its cwd is still recorded for folder-move detection
+            head = f.readline()
+            if (project_path and b"session_meta" in head
+                    and project_path.encode() not in head):
+                try:
+                    meta = json_loads(head)
+                    if meta.get("type") == "session_meta":
+                        cwd = meta.get("payload", {}).get("cwd", "")
+                except ValueError:
+                    pass
+                return cwd, []
+            f.seek(0)
+            for line in f:
+                # No .strip() — both parsers tolerate the trailing newline, and
+                # blank lines just fall through the except below
+                try:
+                    obj = json_loads(line)
+                except ValueError:
+                    continue
+
+                # Extract cwd from session_meta (always first entry)
+                if obj.get("type") == "session_meta":
+                    cwd = obj.get("payload", {}).get("cwd", "")
+                    continue
+
+                # Check cwd match
+                if cwd is None:
+                    continue
+                if project_path and cwd != project_path:
+                    break  # wrong project, skip rest of file
+                if name_filter and name_filter.lower() not in os.path.basename(cwd).lower():
+                    break
+
+                # Count user prompts
+                if (obj.get("type") == "event_msg" and
+                        obj.get("payload", {}).get("type") == "user_message"):
+                    ts_str = obj.get("timestamp", "")
+                    try:
+                        if ts_str.endswith("Z"):
+                            # Common case: UTC timestamps, date is the first 10 chars
+                            session_prompts.append((ts_str[:10], _fast_iso_to_epoch(ts_str)))
+                        else:
+                            dt = datetime.fromisoformat(ts_str)
+                            session_prompts.append((dt.strftime("%Y-%m-%d"), dt.timestamp()))
+                    except Exception:
+                        session_prompts.append((None, None))
+    except (IOError, PermissionError):
+        return None, []
+
+    return cwd, session_prompts
+
+
+def scan_sessions(sessions_dir, project_path=None, name_filter=None,
+                  since=None, until=None):
     """
     Scan Codex session files. Filter by cwd == project_path (exact) or
-    basename match for name_filter (substring).
-    Returns (daily counts, sorted timestamp list, session count).
+    basename match for name_filter (substring); since/until (YYYY-MM-DD)
+    prune whole day directories before any file is opened.
+    Files are parsed in parallel (I/O bound); merging stays single-threaded.
+    A persistent {file: cwd} index (keyed by mtime+size) lets repeated runs
+    skip files already known to belong to a different project.
+    Returns (daily counts, sorted timestamp list, session count, cwd map).
     """
     sessions_dir = os.path.expanduser(sessions_dir)
     if not os.path.isdir(sessions_dir):
-        return {}, [], 0
+        return {}, [], 0, {}
 
     daily = defaultdict(int)
     timestamps = []
     sessions_found = 0
+    cwd_by_file = {}
 
-    for jsonl_path in sorted(glob.glob(
-        os.path.join(sessions_dir, "**", "*.jsonl"), recursive=True
-    )):
-        cwd = None
-        session_prompts = []
-
-        for line in open(jsonl_path, "r", encoding="utf-8"):
-            line = line.strip()
-            if not line:
+    index = _load_cwd_index()
+    index_dirty = False
+    to_parse = []
+    for path in _iter_session_files(sessions_dir, since, until):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        sig = [int(st.st_mtime), st.st_size]
+        cached = index.get(path)
+        if cached and cached[:2] == sig:
+            cwd = cached[2]
+            cwd_by_file[path] = cwd
+            # Known mismatch from a previous run — no need to open the file
+            if project_path and cwd != project_path:
                 continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
+            if name_filter and name_filter.lower() not in os.path.basename(cwd).lower():
                 continue
+        to_parse.append((path, sig))
 
-            # Extract cwd from session_meta (always first entry)
-            if obj.get("type") == "session_meta":
-                cwd = obj.get("payload", {}).get("cwd", "")
-                continue
+    if not to_parse:
+        return dict(sorted(daily.items())), timestamps, 0, cwd_by_file
 
-            # Check cwd match
-            if cwd is None:
+    with ThreadPoolExecutor(max_workers=min(16, len(to_parse))) as ex:
+        parse = partial(_parse_session_file, project_path=project_path,
+                        name_filter=name_filter)
+        results = ex.map(parse, (path for path, _sig in to_parse))
+        for (path, sig), (cwd, session_prompts) in zip(to_parse, results):
+            if cwd:
+                cwd_by_file[path] = cwd
+                if index.get(path) != sig + [cwd]:
+                    index[path] = sig + [cwd]
+                    index_dirty = True
+            if not session_prompts:
                 continue
-            if project_path and cwd != project_path:
-                break  # wrong project, skip rest of file
-            if name_filter and name_filter.lower() not in os.path.basename(cwd).lower():
-                break
-
-            # Count user prompts
-            if (obj.get("type") == "event_msg" and
-                    obj.get("payload", {}).get("type") == "user_message"):
-                ts_str = obj.get("timestamp", "")
-                try:
-                    dt = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
-                    ts_epoch = dt.timestamp()
-                    date = dt.strftime("%Y-%m-%d")
-                    session_prompts.append((date, ts_epoch))
-                except Exception:
-                    session_prompts.append((None, None))
-
-        if session_prompts:
             sessions_found += 1
             for date, ts in session_prompts:
                 if date:
@@ -90,37 +218,24 @@ def scan_sessions(sessions_dir, project_path=None, name_filter=None):
                 if ts:
                     timestamps.append(ts)
 
-    return dict(sorted(daily.items())), sorted(timestamps), sessions_found
+    if index_dirty:
+        _save_cwd_index(index)
 
+    return dict(sorted(daily.items())), sorted(timestamps), sessions_found, cwd_by_file
 
-def find_alternate_paths(sessions_dir, project_path):
+
+def find_alternate_paths(project_path, cwd_by_file):
     """
     When no sessions match project_path, look for sessions with the same
     basename (last path component) at different parent paths.
-    Suggests the project may have been moved.
+    Works entirely off the cwd map built by scan_sessions — no files are
+    reopened or re-parsed. Suggests the project may have been moved.
     """
-    sessions_dir = os.path.expanduser(sessions_dir)
-    if not os.path.isdir(sessions_dir):
-        return []
-
     target_name = os.path.basename(project_path)
-    alternates = set()
-
-    for jsonl_path in glob.glob(
-        os.path.join(sessions_dir, "**", "*.jsonl"), recursive=True
-    ):
-        for line in open(jsonl_path, "r", encoding="utf-8"):
-            try:
-                obj = json.loads(line.strip())
-            except json.JSONDecodeError:
-                continue
-            if obj.get("type") == "session_meta":
-                cwd = obj.get("payload", {}).get("cwd", "")
-                if cwd and cwd != project_path and os.path.basename(cwd) == target_name:
-                    alternates.add(cwd)
-                break  # only read session_meta
-
-    return sorted(alternates)
+    return sorted({
+        cwd for cwd in cwd_by_file.values()
+        if cwd and cwd != project_path and os.path.basename(cwd) == target_name
+    })
 
 
 def main():
@@ -128,14 +243,17 @@ def main():
     parser.add_argument("--project-path", help="Absolute path to the project repo (exact match)")
     parser.add_argument("--filter", help="Substring match on project basename")
     parser.add_argument("--sessions-dir", default="~/.codex/sessions")
+    parser.add_argument("--since", help="Only scan sessions on/after this date YYYY-MM-DD")
+    parser.add_argument("--until", help="Only scan sessions on/before this date YYYY-MM-DD")
     args = parser.parse_args()
 
     if not args.project_path and not args.filter:
         print(json.dumps({"error": "Provide --project-path or --filter"}))
         return
 
-    daily, timestamps, sessions_found = scan_sessions(
-        args.sessions_dir, args.project_path, args.filter
+    daily, timestamps, sessions_found, cwd_by_file = scan_sessions(
+        args.sessions_dir, args.project_path, args.filter,
+        args.since, args.until
     )
 
     result = {
@@ -148,7 +266,7 @@ def main():
 
     # Folder move detection
     if sum(daily.values()) == 0 and args.project_path:
-        alternates = find_alternate_paths(args.sessions_dir, args.project_path)
+        alternates = find_alternate_paths(args.project_path, cwd_by_file)
         if alternates:
             result["alternate_paths"] = alternates
             result["note"] = (
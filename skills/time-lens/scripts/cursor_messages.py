@@ -30,15 +30,45 @@ Output JSON:
   }
 """
 
+import heapq
 import os
 import sys
 import json
 import argparse
 import sqlite3
 from datetime import datetime, timezone
-from collections import defaultdict
+from collections import Counter, defaultdict
+from functools import lru_cache
 from urllib.parse import unquote, urlparse
 
+try:
+    import orjson  # ~3-5x faster; reads and emits UTF-8 bytes directly
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+
+def _print_json(obj):
+    """Pretty-print a result dict to stdout; with orjson the encoder runs in
+    C and the bytes go straight to the buffer, skipping print's re-encode."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
+    else:
+        print(json.dumps(obj, indent=2))
+
+
+def _loads(value):
+    """
+    Parse a cursorDiskKV value, which comes back as TEXT (str) or BLOB
+    (bytes) depending on how Cursor stored it. Bytes feed the decoder
+    directly — no intermediate .decode() pass over the buffer.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return json_loads(value)
+    return {}
+
 
 def get_cursor_data_dir():
     """Return the Cursor User data directory for the current platform."""
@@ -60,17 +90,45 @@ def uri_to_path(uri):
     return uri
 
 
-def paths_match(path1, path2):
-    """Check if two paths refer to the same directory."""
-    return os.path.normpath(path1) == os.path.normpath(path2)
+_norm_cache = {}
+
+
+def _norm(path):
+    """
+    os.path.normpath with memoization — the same few workspace paths recur
+    across thousands of rows, and normpath is pure-Python string work.
+    """
+    norm = _norm_cache.get(path)
+    if norm is None:
+        norm = _norm_cache[path] = os.path.normpath(path)
+    return norm
+
+
+_WS_MAP_CACHE = os.path.expanduser("~/.cache/time-lens/cursor_ws_map.json")
 
 
+@lru_cache(maxsize=1)
 def scan_workspace_mappings(cursor_dir):
-    """Scan workspaceStorage dirs → dict of workspace_id → project_path."""
+    """
+    Scan workspaceStorage dirs → dict of workspace_id → project_path.
+    Memoized in-process (the workspace collector and folder-move detection
+    both need it) and cached on disk keyed by the storage dir's mtime, so
+    warm runs skip opening every workspace.json. New workspaces touch the
+    parent dir's mtime, which invalidates the cache.
+    """
     ws_dir = os.path.join(cursor_dir, "workspaceStorage")
     if not os.path.isdir(ws_dir):
         return {}
 
+    mtime_ns = os.stat(ws_dir).st_mtime_ns
+    try:
+        with open(_WS_MAP_CACHE, "rb") as f:
+            cached = json_loads(f.read())
+        if cached.get("dir") == ws_dir and cached.get("mtime_ns") == mtime_ns:
+            return cached.get("map", {})
+    except (IOError, ValueError):
+        pass
+
     mappings = {}
     for entry in os.scandir(ws_dir):
         if not entry.is_dir():
@@ -79,65 +137,199 @@ def scan_workspace_mappings(cursor_dir):
         if not os.path.exists(ws_json):
             continue
         try:
-            with open(ws_json, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(ws_json, "rb") as f:
+                data = json_loads(f.read())
             folder = data.get("folder", "")
             if folder:
                 mappings[entry.name] = uri_to_path(folder)
-        except (json.JSONDecodeError, IOError):
+        except (ValueError, IOError):
             pass
 
+    try:
+        os.makedirs(os.path.dirname(_WS_MAP_CACHE), exist_ok=True)
+        tmp = _WS_MAP_CACHE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dir": ws_dir, "mtime_ns": mtime_ns, "map": mappings}, f)
+        os.replace(tmp, _WS_MAP_CACHE)
+    except IOError:
+        pass
+
     return mappings
 
 
+def _open_ro(db_path):
+    """
+    Open a state.vscdb read-only with pragmas tuned for one-shot scans:
+    mmap'd page reads (served from the OS page cache), a 64MB page cache so
+    B-tree interior nodes stay resident across the key scans, and in-memory
+    temp store. Returns (conn, cur).
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    cur = conn.cursor()
+    cur.execute("PRAGMA query_only=ON")
+    cur.execute("PRAGMA mmap_size=268435456")
+    cur.execute("PRAGMA cache_size=-65536")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    return conn, cur
+
+
+_day_cache = {}
+
+
+def _utc_date(ts_epoch):
+    """
+    UTC 'YYYY-MM-DD' for an epoch float, memoized per day bucket — messages
+    cluster into few distinct days, so the datetime/strftime work runs once
+    per day instead of once per message.
+    """
+    day_bucket = int(ts_epoch) // 86400
+    date = _day_cache.get(day_bucket)
+    if date is None:
+        date = _day_cache[day_bucket] = datetime.fromtimestamp(
+            day_bucket * 86400, tz=timezone.utc
+        ).strftime("%Y-%m-%d")
+    return date
+
+
 def _extract_bubble_timestamp(bubble):
     """
     Extract a UTC epoch float from a Cursor bubble/message object.
-    Tries fields in priority order (mirrors cursor-history's fallback chain).
-    Returns epoch float or None.
+    Tries fields in priority order (mirrors cursor-history's fallback chain);
+    createdAt succeeds on nearly all modern bubbles, so that path stays
+    branch-light and malformed shapes fall through via the except clauses
+    instead of up-front isinstance checks. Returns epoch float or None.
     """
     # 1. createdAt ISO string (new format, >= Sept 2025)
     created_at = bubble.get("createdAt")
-    if created_at and isinstance(created_at, str):
+    if created_at is not None:
         try:
-            dt = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-            return dt.timestamp()
-        except (ValueError, TypeError):
+            if created_at.endswith("Z"):
+                created_at = created_at[:-1] + "+00:00"
+            return datetime.fromisoformat(created_at).timestamp()
+        except (ValueError, TypeError, AttributeError):
             pass
 
     # 2. timingInfo fields (Unix ms)
     timing = bubble.get("timingInfo")
-    if isinstance(timing, dict):
-        for field in ("clientStartTime", "clientRpcSendTime",
-                      "clientSettleTime", "clientEndTime"):
-            val = timing.get(field)
-            if val and isinstance(val, (int, float)) and val > 1_000_000_000_000:
-                return val / 1000.0
+    if timing is not None:
+        try:
+            for field in ("clientStartTime", "clientRpcSendTime",
+                          "clientSettleTime", "clientEndTime"):
+                val = timing.get(field)
+                if val and val > 1_000_000_000_000:
+                    return val / 1000.0
+        except (TypeError, AttributeError):
+            pass
 
     # 3. Plain timestamp field (legacy, ms epoch)
     ts = bubble.get("timestamp")
-    if ts and isinstance(ts, (int, float)) and ts > 1_000_000_000_000:
-        return ts / 1000.0
+    try:
+        if ts and ts > 1_000_000_000_000:
+            return ts / 1000.0
+    except TypeError:
+        pass
 
     return None
 
 
+def _iter_bubble_timestamps(cur, session_ids):
+    """
+    Yield (session_id, epoch_float) for user (type=1) bubbles belonging to
+    session_ids. With the JSON1 extension (SQLite >= 3.9) the projection
+    runs inside SQLite: only the handful of timestamp scalars per user
+    bubble cross into Python and non-user rows never leave the C scan.
+    Builds without JSON1 fall back to pulling full values and parsing here.
+    """
+    try:
+        cur.execute(
+            "SELECT key,"
+            " json_extract(value, '$.createdAt'),"
+            " json_extract(value, '$.timingInfo.clientStartTime'),"
+            " json_extract(value, '$.timingInfo.clientRpcSendTime'),"
+            " json_extract(value, '$.timingInfo.clientSettleTime'),"
+            " json_extract(value, '$.timingInfo.clientEndTime'),"
+            " json_extract(value, '$.timestamp') "
+            "FROM cursorDiskKV "
+            "WHERE key >= 'bubbleId:' AND key < 'bubbleId;' "
+            "AND json_valid(value) AND json_extract(value, '$.type') = 1"
+        )
+    except sqlite3.OperationalError:
+        # No JSON1 — stream raw values and decode in Python
+        cur.execute(
+            "SELECT key, value FROM cursorDiskKV "
+            "WHERE key >= 'bubbleId:' AND key < 'bubbleId;'"
+        )
+        for key, value in cur:
+            session_id = key.split(":", 2)[1]
+            if session_id not in session_ids:
+                continue
+
+            # Cheap substring probe before the JSON parse: only type=1
+            # (user) bubbles are counted, and a C-level contains scan is
+            # ~100x cheaper than decoding an assistant bubble just to
+            # drop it. Over-approximate — the parsed field decides.
+            if isinstance(value, (bytes, bytearray)):
+                if b'"type":1' not in value and b'"type": 1' not in value:
+                    continue
+            elif isinstance(value, str):
+                if '"type":1' not in value and '"type": 1' not in value:
+                    continue
+
+            try:
+                bubble = _loads(value)
+            except ValueError:
+                continue
+            if bubble.get("type") != 1:
+                continue
+            ts_epoch = _extract_bubble_timestamp(bubble)
+            if ts_epoch is not None:
+                yield session_id, ts_epoch
+        return
+
+    for row in cur:
+        session_id = row[0].split(":", 2)[1]
+        if session_id not in session_ids:
+            continue
+        # Same priority chain as _extract_bubble_timestamp, on the
+        # already-projected scalars
+        created_at = row[1]
+        if created_at is not None:
+            try:
+                if created_at.endswith("Z"):
+                    created_at = created_at[:-1] + "+00:00"
+                yield session_id, datetime.fromisoformat(created_at).timestamp()
+                continue
+            except (ValueError, TypeError, AttributeError):
+                pass
+        for val in row[2:]:
+            try:
+                if val and val > 1_000_000_000_000:
+                    yield session_id, val / 1000.0
+                    break
+            except TypeError:
+                continue
+
+
 def collect_from_global_storage(cursor_dir, project_path=None, name_filter=None):
     """
     Collect user prompt timestamps from global storage's cursorDiskKV table.
-    Returns (daily_counts, timestamps, sessions_found).
+    Deduplicates on rounded timestamps as it goes (the same bubble can show
+    up under more than one key) and returns the seen-set so the workspace
+    collector can extend it instead of rebuilding it.
+    Returns (daily_counts, timestamps, sessions_found, seen_ts).
     """
     global_db = os.path.join(cursor_dir, "globalStorage", "state.vscdb")
+    seen_ts = set()
     if not os.path.exists(global_db):
-        return {}, [], 0
+        return {}, [], 0, seen_ts
 
-    daily = defaultdict(int)
+    daily = Counter()
     timestamps = []
     sessions_found = 0
+    target_norm = os.path.normpath(project_path) if project_path else None
 
     try:
-        conn = sqlite3.connect(f"file:{global_db}?mode=ro", uri=True)
-        cur = conn.cursor()
+        conn, cur = _open_ro(global_db)
 
         # Check if cursorDiskKV table exists
         cur.execute(
@@ -145,67 +337,60 @@ def collect_from_global_storage(cursor_dir, project_path=None, name_filter=None)
         )
         if not cur.fetchone():
             conn.close()
-            return {}, [], 0
+            return {}, [], 0, seen_ts
 
-        # Get all composer sessions with their workspace URIs
+        # Get all composer sessions with their workspace URIs — prefix match
+        # as a PK range scan (';' sorts just after ':'), which stays on the
+        # B-tree index regardless of SQLite's LIKE case-sensitivity setting
         cur.execute(
-            "SELECT key, value FROM cursorDiskKV WHERE key LIKE 'composerData:%'"
+            "SELECT key, value FROM cursorDiskKV "
+            "WHERE key >= 'composerData:' AND key < 'composerData;'"
         )
 
-        matching_session_ids = []
-        for key, value in cur.fetchall():
+        matching_session_ids = set()
+        for key, value in cur:
             try:
                 session_id = key.split(":", 1)[1]
-                data = json.loads(value) if isinstance(value, str) else {}
+                data = _loads(value)
                 ws_uri = data.get("workspaceUri", "")
                 ws_path = uri_to_path(ws_uri)
 
                 if project_path:
-                    if not ws_path or not paths_match(ws_path, project_path):
+                    if not ws_path or _norm(ws_path) != target_norm:
                         continue
                 elif name_filter:
-                    basename = os.path.basename(os.path.normpath(ws_path)) if ws_path else ""
+                    basename = os.path.basename(_norm(ws_path)) if ws_path else ""
                     if not basename or name_filter.lower() not in basename.lower():
                         continue
 
-                matching_session_ids.append(session_id)
-            except (json.JSONDecodeError, IndexError, AttributeError):
+                matching_session_ids.add(session_id)
+            except (ValueError, IndexError, AttributeError):
                 continue
 
-        # For each matching session, get user-message bubble data
-        for session_id in matching_session_ids:
-            session_ts = []
-            cur.execute(
-                "SELECT value FROM cursorDiskKV WHERE key LIKE ?",
-                (f"bubbleId:{session_id}:%",),
-            )
-
-            for (value,) in cur.fetchall():
-                try:
-                    bubble = json.loads(value) if isinstance(value, str) else {}
-                except json.JSONDecodeError:
-                    continue
-
-                # Only count user messages (type=1)
-                if bubble.get("type") != 1:
+        # Single B-tree range scan over all bubble rows (';' sorts just after
+        # ':'), dispatched by session id in Python — avoids one LIKE query
+        # per matching session
+        if matching_session_ids:
+            sessions_with_msgs = set()
+            for session_id, ts_epoch in _iter_bubble_timestamps(
+                    cur, matching_session_ids):
+                ts_rounded = round(ts_epoch)
+                if ts_rounded in seen_ts:
                     continue
+                seen_ts.add(ts_rounded)
+                sessions_with_msgs.add(session_id)
+                timestamps.append(ts_epoch)
 
-                ts_epoch = _extract_bubble_timestamp(bubble)
-                if ts_epoch is not None:
-                    session_ts.append(ts_epoch)
-
-            if session_ts:
-                sessions_found += 1
-                for ts in session_ts:
-                    date = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
-                    daily[date] += 1
-                    timestamps.append(ts)
+            sessions_found = len(sessions_with_msgs)
+            # Batched count: Counter.update tallies at C level, one bulk
+            # operation instead of a dict increment per message
+            daily.update(map(_utc_date, timestamps))
 
         conn.close()
     except (sqlite3.Error, IOError):
         pass
 
-    return dict(sorted(daily.items())), sorted(timestamps), sessions_found
+    return dict(sorted(daily.items())), sorted(timestamps), sessions_found, seen_ts
 
 
 def collect_from_workspace_storage(cursor_dir, project_path=None,
@@ -226,31 +411,67 @@ def collect_from_workspace_storage(cursor_dir, project_path=None,
     daily = defaultdict(int)
     timestamps = []
     sessions_found = 0
+    target_norm = os.path.normpath(project_path) if project_path else None
 
+    matched = []
     for ws_id, ws_path in ws_mappings.items():
-        if project_path and not paths_match(ws_path, project_path):
+        if project_path and _norm(ws_path) != target_norm:
             continue
         if name_filter:
-            basename = os.path.basename(os.path.normpath(ws_path))
+            basename = os.path.basename(_norm(ws_path))
             if name_filter.lower() not in basename.lower():
                 continue
 
         db_path = os.path.join(cursor_dir, "workspaceStorage", ws_id, "state.vscdb")
-        if not os.path.exists(db_path):
-            continue
+        if os.path.exists(db_path):
+            matched.append(db_path)
 
+    keys_sql = (
+        "('composer.composerData',"
+        " 'workbench.panel.aichat.view.aichat.chatdata',"
+        " 'workbench.panel.chat.view.chat.chatdata')"
+    )
+
+    # One connection per batch of workspaces, ATTACHed read-only and read
+    # with a single UNION ALL — amortizes the open/close cycle that
+    # previously ran once per workspace. SQLite's default attach limit
+    # is 10 databases.
+    for start in range(0, len(matched), 10):
+        batch = matched[start:start + 10]
         try:
-            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            conn = sqlite3.connect("file::memory:", uri=True)
             cur = conn.cursor()
+            selects = []
+            for i, db_path in enumerate(batch):
+                try:
+                    cur.execute(f"ATTACH DATABASE ? AS ws_{i}",
+                                (f"file:{db_path}?mode=ro",))
+                    cur.execute(
+                        f"SELECT name FROM ws_{i}.sqlite_master "
+                        "WHERE type='table' AND name='ItemTable'"
+                    )
+                    if cur.fetchone():
+                        selects.append(
+                            f"SELECT key, value FROM ws_{i}.ItemTable "
+                            f"WHERE key IN {keys_sql}"
+                        )
+                except sqlite3.Error:
+                    continue
+            if not selects:
+                conn.close()
+                continue
 
-            # --- Composer data (session-level timestamps) ---
-            cur.execute(
-                "SELECT value FROM ItemTable WHERE key = 'composer.composerData'"
-            )
-            row = cur.fetchone()
-            if row and row[0]:
+            cur.execute(" UNION ALL ".join(selects))
+            for key, value in cur:
+                if not value:
+                    continue
                 try:
-                    data = json.loads(row[0])
+                    data = _loads(value)
+                except ValueError:
+                    continue
+
+                if key == "composer.composerData":
+                    # --- Composer data (session-level timestamps) ---
                     for composer in data.get("allComposers", []):
                         created = composer.get("createdAt")
                         updated = composer.get("lastUpdatedAt")
@@ -261,27 +482,12 @@ def collect_from_workspace_storage(cursor_dir, project_path=None,
                                 ts_rounded = round(ts_epoch)
                                 if ts_rounded not in seen_ts:
                                     seen_ts.add(ts_rounded)
-                                    date = datetime.fromtimestamp(
-                                        ts_epoch, tz=timezone.utc
-                                    ).strftime("%Y-%m-%d")
-                                    daily[date] += 1
+                                    daily[_utc_date(ts_epoch)] += 1
                                     timestamps.append(ts_epoch)
                         if created or updated:
                             sessions_found += 1
-                except json.JSONDecodeError:
-                    pass
-
-            # --- Legacy chat data keys (per-message timestamps) ---
-            for key in (
-                "workbench.panel.aichat.view.aichat.chatdata",
-                "workbench.panel.chat.view.chat.chatdata",
-            ):
-                cur.execute("SELECT value FROM ItemTable WHERE key = ?", (key,))
-                row = cur.fetchone()
-                if not (row and row[0]):
-                    continue
-                try:
-                    data = json.loads(row[0])
+                else:
+                    # --- Legacy chat data keys (per-message timestamps) ---
                     for session in data.get("chatSessions", data.get("tabs", [])):
                         has_msgs = False
                         for msg in session.get("messages", session.get("bubbles", [])):
@@ -294,16 +500,11 @@ def collect_from_workspace_storage(cursor_dir, project_path=None,
                                 ts_rounded = round(ts_epoch)
                                 if ts_rounded not in seen_ts:
                                     seen_ts.add(ts_rounded)
-                                    date = datetime.fromtimestamp(
-                                        ts_epoch, tz=timezone.utc
-                                    ).strftime("%Y-%m-%d")
-                                    daily[date] += 1
+                                    daily[_utc_date(ts_epoch)] += 1
                                     timestamps.append(ts_epoch)
                                     has_msgs = True
                         if has_msgs:
                             sessions_found += 1
-                except json.JSONDecodeError:
-                    pass
 
             conn.close()
         except (sqlite3.Error, IOError):
@@ -312,46 +513,59 @@ def collect_from_workspace_storage(cursor_dir, project_path=None,
     return dict(sorted(daily.items())), sorted(timestamps), sessions_found
 
 
+def _merge_sorted_unique(a, b):
+    """
+    One-pass merge of two already-sorted lists, dropping consecutive
+    duplicates — avoids the concatenate + set + re-sort round trip.
+    """
+    last = None
+    for x in heapq.merge(a, b):
+        if x != last:
+            yield x
+            last = x
+
+
 def find_alternate_paths(cursor_dir, project_path):
     """
     When no sessions match project_path, look for workspaces with the same
     basename at different parent paths.
     """
     ws_mappings = scan_workspace_mappings(cursor_dir)
-    target_name = os.path.basename(os.path.normpath(project_path))
+    target_norm = os.path.normpath(project_path)
+    target_name = os.path.basename(target_norm)
     alternates = set()
 
     for _ws_id, ws_path in ws_mappings.items():
         if not ws_path:
             continue
-        if (not paths_match(ws_path, project_path)
-                and os.path.basename(os.path.normpath(ws_path)) == target_name):
+        if (_norm(ws_path) != target_norm
+                and os.path.basename(_norm(ws_path)) == target_name):
             alternates.add(ws_path)
 
     # Also check global storage composerData for workspaceUri matches
     global_db = os.path.join(cursor_dir, "globalStorage", "state.vscdb")
     if os.path.exists(global_db):
         try:
-            conn = sqlite3.connect(f"file:{global_db}?mode=ro", uri=True)
-            cur = conn.cursor()
+            conn, cur = _open_ro(global_db)
             cur.execute(
                 "SELECT name FROM sqlite_master "
                 "WHERE type='table' AND name='cursorDiskKV'"
             )
             if cur.fetchone():
                 cur.execute(
-                    "SELECT value FROM cursorDiskKV WHERE key LIKE 'composerData:%'"
+                    "SELECT value FROM cursorDiskKV "
+                    "WHERE key >= 'composerData:' AND key < 'composerData;'"
                 )
-                for (value,) in cur.fetchall():
+                for (value,) in cur:
                     try:
-                        data = json.loads(value) if isinstance(value, str) else {}
+                        data = _loads(value)
                         ws_uri = data.get("workspaceUri", "")
                         ws_path = uri_to_path(ws_uri)
-                        if (ws_path and not paths_match(ws_path, project_path)
-                                and os.path.basename(os.path.normpath(ws_path))
+                        if (ws_path and _norm(ws_path) != target_norm
+                                and os.path.basename(_norm(ws_path))
                                 == target_name):
                             alternates.add(ws_path)
-                    except (json.JSONDecodeError, AttributeError):
+                    except (ValueError, AttributeError):
                         pass
             conn.close()
         except (sqlite3.Error, IOError):
@@ -380,12 +594,11 @@ def main():
     cursor_dir = get_cursor_data_dir()
 
     # Primary: global storage (per-message timestamps from cursorDiskKV)
-    daily_global, ts_global, sessions_global = collect_from_global_storage(
+    daily_global, ts_global, sessions_global, seen_ts = collect_from_global_storage(
         cursor_dir, args.project_path, args.filter
     )
 
     # Fallback: workspace storage (session-level + legacy per-message timestamps)
-    seen_ts = {round(t) for t in ts_global}
     daily_ws, ts_ws, sessions_ws = collect_from_workspace_storage(
         cursor_dir, args.project_path, args.filter, seen_ts
     )
@@ -396,7 +609,7 @@ def main():
         date: daily_global.get(date, 0) + daily_ws.get(date, 0)
         for date in sorted(all_dates)
     }
-    all_timestamps = sorted(set(ts_global + ts_ws))
+    all_timestamps = list(_merge_sorted_unique(ts_global, ts_ws))
 
     result = {
         "project_path": args.project_path or args.filter,
@@ -423,7 +636,7 @@ def main():
                 f"Project may have been moved."
             )
 
-    print(json.dumps(result, indent=2))
+    _print_json(result)
 
 
 if __name__ == "__main__":
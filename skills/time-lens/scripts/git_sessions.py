@@ -16,35 +16,41 @@ import argparse
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+try:
+    import numpy as np  # optional: vectorized session detection on large histories
+except ImportError:
+    np = None
+
 SESSION_GAP_HOURS = 1.5   # commits > this apart = new session
 SESSION_BUFFER = 0.5       # hours added per session (startup/context-switching)
 MIN_SESSION_HOURS = 0.5    # minimum session duration
 
 
 def get_commits(repo_path, since=None, until=None):
-    cmd = ["git", "-C", repo_path, "log", "--format=%H\t%ai\t%s", "--no-merges"]
+    # --date=unix gives an integer epoch directly — no per-commit ISO parsing;
+    # streaming the pipe avoids buffering the whole log in memory at once
+    cmd = ["git", "-C", repo_path, "log", "--format=%H\t%ad\t%s",
+           "--date=unix", "--no-merges"]
     if since:
         cmd += [f"--since={since}"]
     if until:
         cmd += [f"--until={until}"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error: {result.stderr}", file=sys.stderr)
-        return []
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True)
     commits = []
-    for line in result.stdout.strip().split("\n"):
-        if not line:
-            continue
-        parts = line.split("\t", 2)
+    for line in proc.stdout:
+        parts = line.rstrip("\n").split("\t", 2)
         if len(parts) >= 2:
             sha, ts_str = parts[0], parts[1]
             msg = parts[2] if len(parts) > 2 else ""
             try:
-                # Parse ISO 8601 with timezone offset
-                ts = datetime.fromisoformat(ts_str)
-                commits.append({"sha": sha, "ts": ts, "msg": msg})
+                commits.append({"sha": sha, "ts": int(ts_str), "msg": msg})
             except ValueError:
                 pass
+    proc.wait()
+    if proc.returncode != 0:
+        print(f"Error: {proc.stderr.read()}", file=sys.stderr)
+        return []
     return sorted(commits, key=lambda c: c["ts"])
 
 
@@ -52,10 +58,17 @@ def detect_sessions(commits):
     """Group commits into sessions (gap > SESSION_GAP_HOURS = new session)."""
     if not commits:
         return []
+    if np is not None:
+        # Vectorized: one diff pass over an int64 array instead of a Python loop
+        ts = np.fromiter((c["ts"] for c in commits), dtype=np.int64,
+                         count=len(commits))
+        breaks = np.flatnonzero(np.diff(ts) > SESSION_GAP_HOURS * 3600) + 1
+        bounds = [0] + breaks.tolist() + [len(commits)]
+        return [commits[a:b] for a, b in zip(bounds, bounds[1:])]
     sessions = []
     current = [commits[0]]
     for commit in commits[1:]:
-        gap = (commit["ts"] - current[-1]["ts"]).total_seconds() / 3600
+        gap = (commit["ts"] - current[-1]["ts"]) / 3600
         if gap > SESSION_GAP_HOURS:
             sessions.append(current)
             current = [commit]
@@ -70,7 +83,7 @@ def session_hours(session):
     if len(session) == 1:
         raw = 0.0
     else:
-        raw = (session[-1]["ts"] - session[0]["ts"]).total_seconds() / 3600
+        raw = (session[-1]["ts"] - session[0]["ts"]) / 3600
     return max(raw + SESSION_BUFFER, MIN_SESSION_HOURS)
 
 
@@ -94,8 +107,9 @@ def main():
     total_hours = 0.0
 
     for s in sessions:
-        start = s[0]["ts"]
-        end = s[-1]["ts"]
+        # Datetimes are only reconstructed here, once per session, for display
+        start = datetime.fromtimestamp(s[0]["ts"])
+        end = datetime.fromtimestamp(s[-1]["ts"])
         h = session_hours(s)
         date_str = start.strftime("%Y-%m-%d")
         daily_hours[date_str] += h
@@ -116,8 +130,8 @@ def main():
         "total_sessions": len(sessions),
         "total_hours": round(total_hours, 2),
         "date_range": {
-            "first": commits[0]["ts"].strftime("%Y-%m-%d"),
-            "last": commits[-1]["ts"].strftime("%Y-%m-%d"),
+            "first": datetime.fromtimestamp(commits[0]["ts"]).strftime("%Y-%m-%d"),
+            "last": datetime.fromtimestamp(commits[-1]["ts"]).strftime("%Y-%m-%d"),
         },
         "sessions": session_data,
         "daily_hours": dict(sorted(daily_hours.items())),
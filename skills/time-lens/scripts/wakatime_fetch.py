@@ -12,14 +12,59 @@ Output: JSON with daily summaries and per-project breakdown.
 """
 
 import configparser
+import hashlib
+import http.client
 import os
 import json
 import sys
 import argparse
-import urllib.request
+import threading
+import time
 import urllib.parse
 import base64
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from operator import itemgetter
+
+try:
+    import numpy as np  # optional: vectorizes the interval merge
+except ImportError:
+    np = None
+
+try:
+    import orjson  # optional: C-level JSON encoder for the final output
+except ImportError:
+    orjson = None
+
+
+def _print_json(obj):
+    """Pretty-print a result dict to stdout; with orjson the encoder runs in
+    C and the bytes go straight to the buffer, skipping print's re-encode."""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        sys.stdout.buffer.write(b"\n")
+    else:
+        print(json.dumps(obj, indent=2))
+
+_CACHE_DIR = os.path.expanduser("~/.cache/wakatime-skill")
+
+_API_HOST = "api.wakatime.com"
+_conn_local = threading.local()
+
+
+def _get_connection():
+    """
+    Per-thread keep-alive HTTPS connection — amortizes the TLS handshake
+    over all requests a worker makes instead of paying it on every call.
+    """
+    conn = getattr(_conn_local, "conn", None)
+    if conn is None:
+        conn = _conn_local.conn = http.client.HTTPSConnection(
+            _API_HOST, timeout=15
+        )
+    return conn
 
 
 def read_api_key():
@@ -31,38 +76,85 @@ def read_api_key():
     return config.get("settings", "api_key", fallback=None)
 
 
-def api_request(endpoint, api_key, params=None):
-    base_url = "https://api.wakatime.com/api/v1"
-    url = f"{base_url}{endpoint}"
-    if params:
-        url += "?" + urllib.parse.urlencode(params)
+def _cache_ttl(params):
+    """
+    Cache lifetime for a request: days before today (UTC) never change on
+    the WakaTime side, so keep them for a week; anything touching today
+    gets 5 minutes.
+    """
+    date = (params or {}).get("date")
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    if date and date < today:
+        return 7 * 86400
+    return 300
+
+
+def api_request(endpoint, api_key, params=None, use_cache=True):
+    query = urllib.parse.urlencode(sorted(params.items())) if params else ""
+    path = f"/api/v1{endpoint}"
+    if query:
+        path += "?" + query
+
+    # On-disk response cache keyed by endpoint + query; freshness comes from
+    # the file's own mtime, no sidecar metadata needed
+    cache_path = None
+    if use_cache:
+        key = hashlib.sha1(f"{endpoint}?{query}".encode()).hexdigest()
+        cache_path = os.path.join(_CACHE_DIR, key + ".json")
+        try:
+            if time.time() - os.path.getmtime(cache_path) < _cache_ttl(params):
+                with open(cache_path, "rb") as f:
+                    return json.loads(f.read())
+        except (OSError, ValueError):
+            pass
 
     # WakaTime uses Basic Auth with base64-encoded API key
     encoded_key = base64.b64encode(api_key.encode()).decode()
-    req = urllib.request.Request(url, headers={
+    headers = {
         "Authorization": f"Basic {encoded_key}",
         "User-Agent": "project-time-tracker-skill/1.0",
-    })
+    }
     try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            return json.loads(response.read().decode())
-    except urllib.error.HTTPError as e:
-        return {"error": f"HTTP {e.code}: {e.reason}"}
+        conn = _get_connection()
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Stale keep-alive socket (server closed it) — reconnect once
+            conn.close()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+        body = response.read()
+        if response.status != 200:
+            return {"error": f"HTTP {response.status}: {response.reason}"}
+        data = json.loads(body)
     except Exception as e:
         return {"error": str(e)}
 
+    if cache_path:
+        try:
+            os.makedirs(_CACHE_DIR, exist_ok=True)
+            tmp = cache_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, cache_path)
+        except IOError:
+            pass
+
+    return data
 
-def fetch_summaries(api_key, start, end, project=None):
+
+def fetch_summaries(api_key, start, end, project=None, use_cache=True):
     params = {"start": start, "end": end}
     if project:
         params["project"] = project
-    data = api_request("/users/current/summaries", api_key, params)
+    data = api_request("/users/current/summaries", api_key, params, use_cache)
     if "error" in data:
         return data
 
     # Parse daily summaries
     daily = []
-    project_totals = {}
+    project_totals = defaultdict(int)
     total_seconds = 0
 
     for day in data.get("data", []):
@@ -81,7 +173,7 @@ def fetch_summaries(api_key, start, end, project=None):
         for proj in day.get("projects", []):
             pname = proj.get("name", "unknown")
             psecs = proj.get("total_seconds", 0)
-            project_totals[pname] = project_totals.get(pname, 0) + psecs
+            project_totals[pname] += psecs
 
     return {
         "start": start,
@@ -90,97 +182,137 @@ def fetch_summaries(api_key, start, end, project=None):
         "daily": daily,
         "projects": [
             {"project": k, "hours": round(v / 3600, 2)}
-            for k, v in sorted(project_totals.items(), key=lambda x: -x[1])
+            for k, v in sorted(project_totals.items(), key=itemgetter(1),
+                               reverse=True)
         ],
     }
 
 
-def fetch_durations(api_key, start, end, project=None):
+def _merge_intervals(intervals, tolerance=60):
     """
-    Fetch coding duration intervals from the /durations API.
-    Each entry has `time` (epoch start) and `duration` (seconds).
-    Returns list of [start_epoch, end_epoch] intervals for union computation.
-
-    Note: /durations requires one request per day, so this iterates over the date range.
+    Merge [start, end] interval pairs whose gaps are within `tolerance`
+    seconds (WakaTime splits durations per file, so adjacent intervals
+    abound). Vectorized with NumPy when available; interval groups fall out
+    of a cumulative-max over sorted ends. Pure-Python loop otherwise.
     """
-    intervals = []
-    current = datetime.strptime(start, "%Y-%m-%d")
-    end_dt = datetime.strptime(end, "%Y-%m-%d")
-
-    while current <= end_dt:
-        date_str = current.strftime("%Y-%m-%d")
-        params = {"date": date_str}
-        if project:
-            params["project"] = project
-        data = api_request("/users/current/durations", api_key, params)
-
-        if "error" not in data:
-            for entry in data.get("data", []):
-                t = entry.get("time", 0)
-                d = entry.get("duration", 0)
-                if t and d > 0:
-                    intervals.append([t, t + d])
-
-        current += timedelta(days=1)
-
-    # Merge adjacent/overlapping intervals (WakaTime may have per-file splits)
     if not intervals:
-        return intervals
+        return []
+
+    if np is not None:
+        arr = np.asarray(intervals, dtype=np.float64)
+        arr = arr[arr[:, 0].argsort()]
+        running_end = np.maximum.accumulate(arr[:, 1])
+        gaps = arr[1:, 0] > running_end[:-1] + tolerance
+        group_starts = np.r_[0, np.flatnonzero(gaps) + 1]
+        starts = arr[group_starts, 0]
+        ends = np.maximum.reduceat(arr[:, 1], group_starts)
+        return np.column_stack([starts, ends]).tolist()
+
     intervals.sort()
-    merged = [intervals[0]]
+    merged = [list(intervals[0])]
     for s, e in intervals[1:]:
-        if s <= merged[-1][1] + 60:  # 60s tolerance for file switches
+        if s <= merged[-1][1] + tolerance:
             merged[-1][1] = max(merged[-1][1], e)
         else:
             merged.append([s, e])
-
     return merged
 
 
+def _fetch_duration_day(date_str, api_key, project=None, use_cache=True):
+    """
+    One /durations call; returns [[start_epoch, end_epoch], ...] for that day.
+    Retries once on HTTP 429 (rate limit) after a short pause.
+    """
+    params = {"date": date_str}
+    if project:
+        params["project"] = project
+    for attempt in range(2):
+        data = api_request("/users/current/durations", api_key, params, use_cache)
+        if attempt == 0 and "429" in str(data.get("error", "")):
+            time.sleep(2)
+            continue
+        break
+
+    intervals = []
+    if "error" not in data:
+        for entry in data.get("data", []):
+            t = entry.get("time", 0)
+            d = entry.get("duration", 0)
+            if t and d > 0:
+                intervals.append([t, t + d])
+    return intervals
+
+
+def fetch_duration_days(dates, api_key, project=None, use_cache=True):
+    """
+    Fetch /durations for each date in parallel (the calls are pure network
+    wait, so threads overlap the round trips) and flatten the intervals.
+    """
+    if not dates:
+        return []
+    fetch = partial(_fetch_duration_day, api_key=api_key, project=project,
+                    use_cache=use_cache)
+    intervals = []
+    with ThreadPoolExecutor(max_workers=min(8, len(dates))) as ex:
+        for day_intervals in ex.map(fetch, dates):
+            intervals.extend(day_intervals)
+    return intervals
+
+
+def fetch_durations(api_key, start, end, project=None, use_cache=True,
+                    only_days=None):
+    """
+    Fetch coding duration intervals from the /durations API.
+    Each entry has `time` (epoch start) and `duration` (seconds).
+    Returns list of [start_epoch, end_epoch] intervals for union computation.
+
+    Note: /durations requires one request per day, so this fans out over the
+    date range (up to 8 requests in flight). Pass only_days (YYYY-MM-DD
+    strings) to restrict the fetch to known-active days instead of every
+    day between start and end.
+    """
+    if only_days is not None:
+        dates = list(only_days)
+    else:
+        dates = []
+        current = datetime.strptime(start, "%Y-%m-%d")
+        end_dt = datetime.strptime(end, "%Y-%m-%d")
+        while current <= end_dt:
+            dates.append(current.strftime("%Y-%m-%d"))
+            current += timedelta(days=1)
+
+    intervals = fetch_duration_days(dates, api_key, project, use_cache)
+
+    # 60s tolerance bridges per-file switches
+    return _merge_intervals(intervals)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fetch WakaTime coding stats")
     parser.add_argument("--start", required=True, help="Start date YYYY-MM-DD")
     parser.add_argument("--end", required=True, help="End date YYYY-MM-DD")
     parser.add_argument("--project", help="Filter by project name")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk response cache")
     args = parser.parse_args()
+    use_cache = not args.no_cache
 
     api_key = read_api_key()
     if not api_key:
         print(json.dumps({"error": "No WakaTime API key found in ~/.wakatime.cfg"}))
         sys.exit(1)
 
-    result = fetch_summaries(api_key, args.start, args.end, args.project)
+    result = fetch_summaries(api_key, args.start, args.end, args.project, use_cache)
 
     # Also fetch duration intervals for union computation
     # Only do this for active days to avoid hammering the API for empty days
     active_dates = [d["date"] for d in result.get("daily", [])] if "error" not in result else []
-    all_intervals = []
-    for date_str in active_dates:
-        params = {"date": date_str}
-        if args.project:
-            params["project"] = args.project
-        data = api_request("/users/current/durations", api_key, params)
-        if "error" not in data:
-            for entry in data.get("data", []):
-                t = entry.get("time", 0)
-                d = entry.get("duration", 0)
-                if t and d > 0:
-                    all_intervals.append([t, t + d])
-
-    # Merge adjacent per-file intervals
-    if all_intervals:
-        all_intervals.sort()
-        merged_intervals = [all_intervals[0]]
-        for s, e in all_intervals[1:]:
-            if s <= merged_intervals[-1][1] + 60:
-                merged_intervals[-1][1] = max(merged_intervals[-1][1], e)
-            else:
-                merged_intervals.append([s, e])
-        result["intervals"] = merged_intervals
-    else:
-        result["intervals"] = []
+    result["intervals"] = fetch_durations(
+        api_key, args.start, args.end, args.project, use_cache,
+        only_days=active_dates,
+    )
 
-    print(json.dumps(result, indent=2))
+    _print_json(result)
 
 
 if __name__ == "__main__":